@@ -0,0 +1,67 @@
+import polars as pl
+
+# Reines Analyse-Skript: polars liest die Datei direkt über calamine,
+# Preisspalten als Text, damit "Auf Anfrage" nicht beim Inferieren verloren geht
+PRICE_COLUMNS = ['Preis 1', 'Preis 2', 'Preis 3', 'Preis 4']
+
+xl = pl.read_excel(
+    r'C:\Users\benfi\Downloads\Alle Artikel_gemerged.xlsx',
+    engine='calamine',
+    schema_overrides={'Artikelnummer': pl.Utf8, **{col: pl.Utf8 for col in PRICE_COLUMNS}},
+)
+
+# Tabellen wie bei pandas.to_string() komplett ausgeben
+pl.Config.set_tbl_cols(-1)
+pl.Config.set_tbl_rows(-1)
+pl.Config.set_fmt_str_lengths(80)
+pl.Config.set_tbl_width_chars(250)
+
+print('=' * 80)
+print('EXCEL-DATEI STRUKTUR')
+print('=' * 80)
+print(f'\nAnzahl Artikel: {xl.height}')
+print(f'\nSpaltennamen: {xl.columns}')
+print(f'\nDatentypen:\n{xl.schema}')
+
+print('\n' + '=' * 80)
+print('PREIS-ANALYSE')
+print('=' * 80)
+
+preis1 = pl.col('Preis 1').cast(pl.Float64, strict=False)
+preis2 = pl.col('Preis 2').cast(pl.Float64, strict=False)
+preis3 = pl.col('Preis 3').cast(pl.Float64, strict=False)
+preis4 = pl.col('Preis 4').cast(pl.Float64, strict=False)
+
+# Auf Anfrage Artikel
+auf_anfrage = xl.filter(pl.col('Preis 1').str.contains('Auf Anfrage', literal=True))
+print(f'\nArtikel mit "Auf Anfrage": {auf_anfrage.height}')
+
+# Numerische Preise
+numerisch = xl.filter(preis1 > 0)
+print(f'Artikel mit numerischem Preis 1: {numerisch.height}')
+
+# Mehrere Preise
+multi_preis = xl.filter((preis2 > 0) | (preis3 > 0) | (preis4 > 0))
+print(f'Artikel mit Staffelpreisen (Preis 2/3/4): {multi_preis.height}')
+
+print('\n' + '=' * 80)
+print('BEISPIELE: NUR PREIS 1')
+print('=' * 80)
+nur_p1 = xl.filter((preis1 > 0) & (preis2 == 0)).head(5)
+print(nur_p1.select(['Artikelnummer', 'Matchcode', 'Preis 1', 'Preis 2', 'Preis 3', 'Preis 4', 'Preis pro']))
+
+print('\n' + '=' * 80)
+print('BEISPIELE: STAFFELPREISE')
+print('=' * 80)
+print(multi_preis.head(10).select(['Artikelnummer', 'Matchcode', 'Beschreibung', 'Preis 1', 'Preis 2', 'Preis 3', 'Preis 4', 'Preis pro']))
+
+print('\n' + '=' * 80)
+print('BESCHREIBUNGS-ANALYSE FÜR STAFFELPREISE')
+print('=' * 80)
+print('\nBeispiele mit Beschreibung:')
+for row in multi_preis.head(5).iter_rows(named=True):
+    print(f"\nArtikel {row['Artikelnummer']}:")
+    print(f"  Matchcode: {row['Matchcode']}")
+    print(f"  Beschreibung: {row['Beschreibung']}")
+    print(f"  Preise: {row['Preis 1']} / {row['Preis 2']} / {row['Preis 3']} / {row['Preis 4']}")
+    print(f"  Preis pro: {row['Preis pro']}")
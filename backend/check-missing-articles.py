@@ -1,32 +1,38 @@
 
-import pandas as pd
 import json
-import requests
+import sys
+from pathlib import Path
+
+# Projekt-Root auf den Pfad, damit die gemeinsamen utils genutzt werden können
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.article_api import REQUEST_TIMEOUT, articles_by_number, create_session
+from utils.excel_cache import load_excel
 
 excel_path = r'C:\Users\benfi\Downloads\Alle Artikel_gemerged.xlsx'
 api_url = 'http://localhost:3001/api/articles?limit=2000'
+article_column = 'Artikelnummer'
 
-# Excel lesen
-df = pd.read_excel(excel_path)
-print(f"Excel hat {len(df)} Zeilen")
+# Session mit Keep-Alive und Retry bei 502/503/504
+session = create_session()
 
-# Artikelnummern aus Excel extrahieren
-article_columns = ['Artikel', 'Artikelnummer', 'Art.-Nr.', 'Art.Nr.', 'Artikel-Nr.', 'ArtikelNr']
-excel_articles = set()
+# Excel lesen - nur die Artikelnummer-Spalte wird gebraucht
+df = load_excel(excel_path, [article_column])
+print(f"Excel hat {len(df)} Zeilen")
 
-for col in article_columns:
-    if col in df.columns:
-        excel_articles.update(df[col].dropna().astype(str).str.strip())
-        break
+# Artikelnummern einmal normalisieren, Zeilen ohne Nummer fallen raus
+df[article_column] = df[article_column].str.strip()
+df = df[df[article_column].notna() & df[article_column].ne('')]
+excel_articles = set(df[article_column])
 
 print(f"Excel hat {len(excel_articles)} unique Artikelnummern")
 
 # System-Artikel abrufen
-response = requests.get(api_url)
+response = session.get(api_url, timeout=REQUEST_TIMEOUT)
 system_data = response.json()
 
 if system_data.get('success'):
-    system_articles = {str(a['articleNumber']).strip() for a in system_data['data'] if a.get('articleNumber')}
+    system_articles = set(articles_by_number(system_data['data']))
     print(f"System hat {len(system_articles)} Artikel")
 
     # Fehlende identifizieren
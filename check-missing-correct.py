@@ -4,32 +4,31 @@
 KORREKTER Vergleich: Excel Spalte A vs ALLE System-Artikel
 """
 
-import pandas as pd
-import json
-import requests
+import numpy as np
+import orjson
+
+from utils.article_api import REQUEST_TIMEOUT, articles_by_number, create_session, fetch_all_articles
+from utils.excel_cache import load_articles, normalize_article_numbers
 
 EXCEL_PATH = r'C:\Users\benfi\Downloads\Alle Artikel_gemerged.xlsx'
 API_URL = 'http://localhost:3001/api/articles'
+ARTICLE_COLUMN = 'Artikelnummer'
+
+session = create_session()
 
 print('ARTIKEL-VERGLEICH - KORREKTE VERSION\n')
 print('=' * 60)
 
 # 1. Excel lesen - SPALTE A hat die Artikelnummern!
 print('\n1. Lese Excel-Datei (Spalte A = Artikelnummern)...')
-df = pd.read_excel(EXCEL_PATH)
+# Alle Spalten nötig, da die komplette Zeile als excelData gespeichert wird
+df = load_articles(EXCEL_PATH)
 print(f'   Excel hat {len(df)} Zeilen')
 
-# Spalte A ist die erste Spalte (Index 0)
-first_column = df.columns[0]
-print(f'   Spalte A heisst: "{first_column}"')
-
-# Artikelnummern aus Spalte A extrahieren
-excel_articles = set()
-for value in df[first_column]:
-    if pd.notna(value):
-        article_num = str(value).strip()
-        if article_num and article_num != 'nan':
-            excel_articles.add(article_num)
+# Artikelnummern einmal normalisieren - alle weiteren Vergleiche und der
+# Zeilen-Lookup arbeiten mit der getrimmten Spalte
+df = normalize_article_numbers(df, ARTICLE_COLUMN)
+excel_articles = set(df[ARTICLE_COLUMN].unique())
 
 print(f'   Excel hat {len(excel_articles)} unique Artikelnummern')
 
@@ -37,49 +36,35 @@ print(f'   Excel hat {len(excel_articles)} unique Artikelnummern')
 print('\n2. Hole ALLE Artikel aus dem System...')
 
 # Erst mal schauen wieviele es gibt
-response = requests.get(f'{API_URL}?limit=1')
+response = session.get(f'{API_URL}?limit=1', timeout=REQUEST_TIMEOUT)
 data = response.json()
 total_count = data.get('pagination', {}).get('total', 0)
 print(f'   Total im System: {total_count} Artikel')
 
-# Jetzt ALLE holen
-all_system_articles = []
-page = 1
-limit = 100
-
-while True:
-    response = requests.get(f'{API_URL}?page={page}&limit={limit}')
-    data = response.json()
-
-    if data.get('success'):
-        articles = data.get('data', [])
-        all_system_articles.extend(articles)
-
-        print(f'   Seite {page}: {len(articles)} Artikel geladen')
-
-        # Prüfe ob es noch mehr gibt
-        pagination = data.get('pagination', {})
-        if not pagination.get('hasNext', False):
-            break
-        page += 1
-    else:
-        break
+# Jetzt ALLE holen - alle Seiten parallel
+all_system_articles = fetch_all_articles(
+    API_URL,
+    total=total_count,
+    session=session,
+    on_page=lambda page, articles: print(f'   Seite {page}: {len(articles)} Artikel geladen')
+)
 
 print(f'   GESAMT: {len(all_system_articles)} Artikel im System geladen')
 
 # System-Artikel als Set von Artikelnummern
-system_article_numbers = set()
-for article in all_system_articles:
-    if article.get('articleNumber'):
-        system_article_numbers.add(str(article['articleNumber']).strip())
+system_article_numbers = set(articles_by_number(all_system_articles))
 
 print(f'   {len(system_article_numbers)} unique Artikelnummern im System')
 
 # 3. Vergleichen
 print('\n3. Vergleiche Excel mit System...')
 
-missing = excel_articles - system_article_numbers
-found = excel_articles & system_article_numbers
+# Sortierte Arrays statt Python-Sets: Differenz/Schnitt laufen in C,
+# und missing ist danach bereits sortiert
+excel_arr = np.unique(np.asarray(list(excel_articles), dtype=str))
+system_arr = np.unique(np.asarray(list(system_article_numbers), dtype=str))
+missing = np.setdiff1d(excel_arr, system_arr, assume_unique=True).tolist()
+found = excel_arr[np.isin(excel_arr, system_arr, assume_unique=True)].tolist()
 
 print(f'   GEFUNDEN: {len(found)} Artikel aus Excel sind bereits im System')
 print(f'   FEHLEN:   {len(missing)} Artikel aus Excel fehlen noch')
@@ -87,24 +72,23 @@ print(f'   FEHLEN:   {len(missing)} Artikel aus Excel fehlen noch')
 # 4. Ergebnisse speichern
 print('\n4. Speichere Ergebnisse...')
 
-# Liste der fehlenden Artikel mit Details aus Excel
+# Excel einmal nach Artikelnummer indizieren (erste Zeile gewinnt) statt pro
+# fehlendem Artikel die ganze Tabelle zu durchsuchen
+df_indexed = df.drop_duplicates(subset=[ARTICLE_COLUMN]).set_index(ARTICLE_COLUMN, drop=False)
+
+# Liste der fehlenden Artikel mit Details aus Excel - nur die ersten 500
+# landen in der Datei, deren Zeilen werden in einem Aufruf als dicts erzeugt.
+# Jede fehlende Nummer stammt aus der normalisierten Spalte, ist also im Index.
+shown_missing = missing[:500]
 missing_with_details = []
-for article_num in sorted(missing):
-    # Finde die Zeile in der Excel
-    row_data = df[df[first_column] == article_num]
-    if not row_data.empty:
-        row = row_data.iloc[0].to_dict()
-        missing_with_details.append({
-            'articleNumber': article_num,
-            'beschreibung': row.get('Beschreibung', ''),
-            'einheit': row.get('Einheit', ''),
-            'preis1': row.get('Preis 1', 0),
-            'excelData': row
-        })
-    else:
-        missing_with_details.append({
-            'articleNumber': article_num
-        })
+for article_num, row in zip(shown_missing, df_indexed.loc[shown_missing].to_dict(orient='records')):
+    missing_with_details.append({
+        'articleNumber': article_num,
+        'beschreibung': row.get('Beschreibung', ''),
+        'einheit': row.get('Einheit', ''),
+        'preis1': row.get('Preis 1', 0),
+        'excelData': row
+    })
 
 # Speichere JSON
 result = {
@@ -115,16 +99,16 @@ result = {
         'missingInSystem': len(missing),
         'coverage': f"{(len(found) / len(excel_articles) * 100):.1f}%"
     },
-    'missingArticles': missing_with_details[:500],  # Erste 500 für die Datei
-    'missingArticleNumbers': sorted(list(missing))
+    'missingArticles': missing_with_details,  # Erste 500 für die Datei
+    'missingArticleNumbers': missing  # bereits sortiert, für beide Dateien wiederverwendet
 }
 
-with open('missing-articles-CORRECT.json', 'w', encoding='utf-8') as f:
-    json.dump(result, f, ensure_ascii=False, indent=2)
+with open('missing-articles-CORRECT.json', 'wb') as f:
+    f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
 
 # Nur die Artikelnummern
-with open('missing-numbers-ONLY.json', 'w', encoding='utf-8') as f:
-    json.dump(sorted(list(missing)), f, indent=2)
+with open('missing-numbers-ONLY.json', 'wb') as f:
+    f.write(orjson.dumps(missing, option=orjson.OPT_INDENT_2))
 
 print('   Gespeichert: missing-articles-CORRECT.json')
 print('   Gespeichert: missing-numbers-ONLY.json')
@@ -143,7 +127,7 @@ print('=' * 60)
 # Zeige ein paar fehlende
 if missing:
     print(f'\nErste 10 fehlende Artikelnummern:')
-    for i, num in enumerate(sorted(list(missing))[:10], 1):
+    for i, num in enumerate(missing[:10], 1):
         print(f'   {i:2}. {num}')
     if len(missing) > 10:
         print(f'   ... und {len(missing) - 10} weitere')
\ No newline at end of file
@@ -6,13 +6,28 @@ und erstellt eine JSON-Datei mit fehlenden Artikeln
 """
 
 import pandas as pd
-import json
-import requests
+import orjson
 from pathlib import Path
 
+from utils.article_api import REQUEST_TIMEOUT, articles_by_number, create_session
+from utils.excel_cache import load_articles, normalize_article_numbers
+
 # Konfiguration
 EXCEL_PATH = r'C:\Users\benfi\Downloads\Alle Artikel_gemerged.xlsx'
 API_URL = 'http://localhost:3001/api/articles'
+ARTICLE_COLUMN = 'Artikelnummer'
+NAME_COLUMNS = ['Bezeichnung', 'Produktname', 'Artikel', 'Name', 'Beschreibung']
+PRICE_COLUMNS = ['Preis', 'VK-Preis', 'Einzelpreis', 'VK', 'Verkaufspreis']
+
+
+def first_value(df, columns):
+    """Pro Zeile den ersten nicht-leeren Wert aus den vorhandenen Spalten"""
+    values = pd.Series(pd.NA, index=df.index, dtype=object)
+    for col in columns:
+        if col in df.columns:
+            values = values.where(values.notna(), df[col].astype(object))
+    return values
+
 
 def main():
     print('ARTIKEL-VERGLEICH: Excel vs System\n')
@@ -21,7 +36,8 @@ def main():
     # Excel-Datei lesen
     print('\n1. Lese Excel-Datei...')
     try:
-        df = pd.read_excel(EXCEL_PATH)
+        # Alle Spalten nötig, da die komplette Zeile als excelRow gespeichert wird
+        df = load_articles(EXCEL_PATH)
         print(f'   OK: Excel geladen: {len(df)} Zeilen')
     except Exception as e:
         print(f'   FEHLER beim Lesen der Excel: {e}')
@@ -30,63 +46,43 @@ def main():
     # Zeige Spalten
     print(f'   Spalten: {", ".join(df.columns[:10])}')
 
-    # Artikelnummern extrahieren - versuche verschiedene Spaltennamen
-    article_columns = ['Artikel', 'Artikelnummer', 'Art.-Nr.', 'Art.Nr.', 'Artikel-Nr.', 'ArtikelNr']
     excel_articles = {}
-    article_column = None
 
-    for col in article_columns:
-        if col in df.columns:
-            article_column = col
-            break
-
-    if not article_column:
-        # Wenn keine Standard-Spalte gefunden, nimm die erste Spalte
-        article_column = df.columns[0]
-        print(f'   Verwende erste Spalte als Artikelnummer: {article_column}')
-
-    # Extrahiere Artikel aus Excel
-    for index, row in df.iterrows():
-        article_number = str(row[article_column]).strip() if pd.notna(row[article_column]) else None
-
-        if article_number and article_number != 'nan':
-            # Sammle alle Daten für diesen Artikel
-            article_data = {
-                'articleNumber': article_number,
-                'excelRow': row.to_dict(),
-                'rowIndex': index + 2  # Excel startet bei Zeile 2 (nach Header)
-            }
-
-            # Versuche Produktname zu finden
-            for col in ['Bezeichnung', 'Produktname', 'Artikel', 'Name', 'Beschreibung']:
-                if col in row and pd.notna(row[col]):
-                    article_data['productName'] = str(row[col])
-                    break
-
-            # Versuche Preis zu finden
-            for col in ['Preis', 'VK-Preis', 'Einzelpreis', 'VK', 'Verkaufspreis']:
-                if col in row and pd.notna(row[col]):
-                    try:
-                        article_data['price'] = float(str(row[col]).replace(',', '.').replace('€', '').strip())
-                    except:
-                        pass
-                    break
-
-            excel_articles[article_number] = article_data
+    # Artikelnummern einmal normalisieren, Zeilen ohne Nummer fallen raus
+    # (der Index bleibt erhalten und liefert weiter die Excel-Zeile)
+    df = normalize_article_numbers(df, ARTICLE_COLUMN)
+
+    # Extrahiere Artikel aus Excel - spaltenweise statt iterrows
+    # Produktname und Preis: jeweils die erste gefüllte Spalte
+    names = first_value(df, NAME_COLUMNS)
+    prices = first_value(df, PRICE_COLUMNS).astype('string').str.replace(',', '.', regex=False).str.replace('€', '', regex=False).str.strip()
+    prices = pd.to_numeric(prices, errors='coerce')
+
+    for article_number, row, index, name, price in zip(
+            df[ARTICLE_COLUMN], df.to_dict(orient='records'), df.index, names, prices):
+        # Sammle alle Daten für diesen Artikel
+        article_data = {
+            'articleNumber': article_number,
+            'excelRow': row,
+            'rowIndex': int(index) + 2  # Excel startet bei Zeile 2 (nach Header)
+        }
+        if pd.notna(name):
+            article_data['productName'] = str(name)
+        if pd.notna(price):
+            article_data['price'] = float(price)
+
+        excel_articles[article_number] = article_data
 
     print(f'   OK: {len(excel_articles)} unique Artikelnummern in Excel')
 
     # System-Artikel abrufen
     print('\n2. Rufe System-Artikel ab...')
     try:
-        response = requests.get(API_URL)
+        response = create_session().get(API_URL, timeout=REQUEST_TIMEOUT)
         system_data = response.json()
 
         if system_data.get('success'):
-            system_articles = {}
-            for article in system_data.get('data', []):
-                if article.get('articleNumber'):
-                    system_articles[str(article['articleNumber']).strip()] = article
+            system_articles = articles_by_number(system_data.get('data', []))
 
             print(f'   OK: {len(system_articles)} Artikel im System')
         else:
@@ -99,18 +95,20 @@ def main():
     # Vergleich durchführen
     print('\n3. Vergleiche Artikel...')
 
-    missing_articles = []
-    found_articles = []
+    # Erst die Nummern als Mengen vergleichen und einmal als Strings sortieren,
+    # dann die Details in dieser Reihenfolge aus excel_articles nachschlagen -
+    # spart das Sortieren der dicts per lambda
+    missing_numbers = sorted(excel_articles.keys() - system_articles.keys())
+    found_numbers = sorted(excel_articles.keys() & system_articles.keys())
 
-    for article_number, excel_data in excel_articles.items():
-        if article_number not in system_articles:
-            missing_articles.append(excel_data)
-        else:
-            found_articles.append({
-                'articleNumber': article_number,
-                'inExcel': excel_data.get('productName', ''),
-                'inSystem': system_articles[article_number].get('productName', '')
-            })
+    missing_articles = [excel_articles[article_number] for article_number in missing_numbers]
+    found_articles = []
+    for article_number in found_numbers:
+        found_articles.append({
+            'articleNumber': article_number,
+            'inExcel': excel_articles[article_number].get('productName', ''),
+            'inSystem': system_articles[article_number].get('productName', '')
+        })
 
     print(f'   OK: {len(found_articles)} Artikel bereits im System')
     print(f'   FEHLEN: {len(missing_articles)} Artikel fehlen im System')
@@ -129,12 +127,12 @@ def main():
             'missingInSystem': len(missing_articles),
             'coverage': f"{(len(found_articles) / len(excel_articles) * 100):.1f}%" if excel_articles else "0%"
         },
-        'missingArticles': sorted(missing_articles, key=lambda x: x['articleNumber']),
-        'foundArticles': sorted(found_articles, key=lambda x: x['articleNumber'])
+        'missingArticles': missing_articles,
+        'foundArticles': found_articles
     }
 
-    with open('missing-articles-full.json', 'w', encoding='utf-8') as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    with open('missing-articles-full.json', 'wb') as f:
+        f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
     print('   Vollstaendige Daten: missing-articles-full.json')
 
     # Kompakte Liste nur mit Artikelnummern und Namen
@@ -147,14 +145,13 @@ def main():
             'excelRow': article.get('rowIndex', 0)
         })
 
-    with open('missing-articles.json', 'w', encoding='utf-8') as f:
-        json.dump(missing_simple, f, ensure_ascii=False, indent=2)
+    with open('missing-articles.json', 'wb') as f:
+        f.write(orjson.dumps(missing_simple, option=orjson.OPT_INDENT_2))
     print('   Kompakte Liste: missing-articles.json')
 
     # Nur Artikelnummern
-    missing_numbers = [a['articleNumber'] for a in missing_articles]
-    with open('missing-article-numbers.json', 'w', encoding='utf-8') as f:
-        json.dump(sorted(missing_numbers), f, indent=2)
+    with open('missing-article-numbers.json', 'wb') as f:
+        f.write(orjson.dumps(missing_numbers, option=orjson.OPT_INDENT_2))
     print('   Nur Nummern: missing-article-numbers.json')
 
     # Statistik anzeigen
@@ -5,12 +5,24 @@ MARKIERT alle Artikel im System, die NICHT in der Excel sind
 Damit kann man diese beim Bulk-Drucken optional ausschließen
 """
 
+import numpy as np
 import pandas as pd
-import json
-import requests
+import orjson
+from pathlib import Path
+
+from utils.article_api import article_number, articles_by_number, fetch_all_articles
+from utils.excel_cache import load_articles, normalize_article_numbers
 
 EXCEL_PATH = r'C:\Users\benfi\Downloads\Alle Artikel_gemerged.xlsx'
 API_URL = 'http://localhost:3001/api/articles'
+ARTICLE_COLUMN = 'Artikelnummer'
+SQL_INSERT_BATCH = 500
+
+
+def sql_literal(value):
+    """Wert als SQL-String-Literal, einfache Anführungszeichen werden verdoppelt"""
+    return "'" + str(value).replace("'", "''") + "'"
+
 
 print('=' * 70)
 print('ARTIKEL MARKIERUNG: Identifiziere Nicht-Excel-Artikel')
@@ -18,67 +30,49 @@ print('=' * 70)
 
 # 1. EXCEL LESEN - Spalte A hat die Artikelnummern
 print('\n[1/5] Lese Excel-Datei...')
-df = pd.read_excel(EXCEL_PATH)
-excel_column = df.columns[0]  # Erste Spalte = Artikelnummer
-print(f'       Spalte: {excel_column}')
+df = normalize_article_numbers(load_articles(EXCEL_PATH, [ARTICLE_COLUMN]), ARTICLE_COLUMN)
+print(f'       Spalte: {ARTICLE_COLUMN}')
 
 # Excel Artikelnummern als Set
-excel_articles = set()
-for value in df[excel_column]:
-    if pd.notna(value):
-        article_num = str(value).strip()
-        if article_num and article_num != 'nan':
-            excel_articles.add(article_num)
+excel_articles = set(df[ARTICLE_COLUMN].unique())
 
 print(f'       OK: {len(excel_articles)} unique Artikelnummern in Excel')
 
 # 2. ALLE SYSTEM-ARTIKEL HOLEN
 print('\n[2/5] Lade ALLE Artikel aus dem System...')
-all_system_articles = []
-page = 1
-limit = 100
-
-while True:
-    response = requests.get(f'{API_URL}?page={page}&limit={limit}')
-    data = response.json()
-
-    if data.get('success') and data.get('data'):
-        articles = data.get('data', [])
-        all_system_articles.extend(articles)
-        print(f'       Seite {page}: {len(articles)} Artikel')
-
-        if not data.get('pagination', {}).get('hasNext', False):
-            break
-        page += 1
-    else:
-        break
+all_system_articles = fetch_all_articles(
+    API_URL,
+    on_page=lambda page, articles: print(f'       Seite {page}: {len(articles)} Artikel')
+)
 
 print(f'       OK: {len(all_system_articles)} Artikel im System')
 
 # 3. VERGLEICHE UND KATEGORISIERE
 print('\n[3/5] Analysiere Artikel...')
 
-in_both = []           # In Excel UND System
-only_in_system = []    # NUR im System (nicht in Excel) <- DIESE MARKIEREN!
-only_in_excel = []     # NUR in Excel (fehlen im System)
+# System-Artikel einmal nach normalisierter Artikelnummer ablegen
+# (articleNumber ist im Backend unique, Artikel ohne Nummer fallen raus)
+sys_by_num = articles_by_number(all_system_articles)
+# Artikel ohne Nummer können weder markiert noch zugeordnet werden - separat ausweisen
+without_number = [a for a in all_system_articles if not article_number(a)]
 
-# System Artikel durchgehen
-for article in all_system_articles:
-    art_num = str(article.get('articleNumber', '')).strip()
-    if art_num in excel_articles:
-        in_both.append(article)
-    else:
-        only_in_system.append(article)
+# Artikelnummern als Arrays - isin/setdiff1d laufen in C
+excel_arr = np.unique(np.asarray(list(excel_articles), dtype=str))
+system_arr = np.asarray(list(sys_by_num), dtype=str)
+in_excel_mask = np.isin(system_arr, excel_arr, assume_unique=True)
 
-# Excel Artikel die nicht im System sind
-system_numbers = {str(a.get('articleNumber')).strip() for a in all_system_articles}
-for excel_num in excel_articles:
-    if excel_num not in system_numbers:
-        only_in_excel.append(excel_num)
+# In Excel UND System
+in_both = [a for a, in_excel in zip(sys_by_num.values(), in_excel_mask) if in_excel]
+# NUR im System (nicht in Excel) <- DIESE MARKIEREN!
+only_in_system = [a for a, in_excel in zip(sys_by_num.values(), in_excel_mask) if not in_excel]
+# NUR in Excel (fehlen im System), sortiert
+only_in_excel = np.setdiff1d(excel_arr, system_arr, assume_unique=True).tolist()
 
 print(f'       OK: {len(in_both)} Artikel in BEIDEN (Excel + System)')
 print(f'       WARNUNG: {len(only_in_system)} Artikel NUR im System (WERDEN MARKIERT!)')
 print(f'       FEHLT: {len(only_in_excel)} Artikel NUR in Excel (fehlen im System)')
+if without_number:
+    print(f'       ÜBERSPRUNGEN: {len(without_number)} System-Artikel ohne Artikelnummer')
 
 # 4. ERSTELLE UPDATE-BEFEHLE
 print('\n[4/5] Erstelle Update-Befehle...')
@@ -111,18 +105,22 @@ result = {
     'timestamp': pd.Timestamp.now().isoformat(),
     'summary': {
         'totalInExcel': len(excel_articles),
-        'totalInSystem': len(all_system_articles),
+        'totalInSystem': len(sys_by_num),
         'inBoth': len(in_both),
         'onlyInSystem_TO_MARK': len(only_in_system),
-        'onlyInExcel_MISSING': len(only_in_excel)
+        'onlyInExcel_MISSING': len(only_in_excel),
+        'withoutArticleNumber_SKIPPED': len(without_number)
     },
     'articlesToMark': articles_to_mark,
     'articlesNotToMark': articles_not_to_mark,
-    'missingInSystem': only_in_excel
+    'missingInSystem': only_in_excel,
+    'skippedWithoutArticleNumber': [
+        {'id': a.get('id'), 'productName': a.get('productName', '')} for a in without_number
+    ]
 }
 
-with open('article-marking-plan.json', 'w', encoding='utf-8') as f:
-    json.dump(result, f, ensure_ascii=False, indent=2)
+with open('article-marking-plan.json', 'wb') as f:
+    f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
 print('       OK: article-marking-plan.json')
 
 # Liste der zu markierenden IDs für Backend
@@ -131,26 +129,37 @@ mark_these = {
     'articleNumbers': [a['articleNumber'] for a in articles_to_mark]
 }
 
-with open('mark-these-articles.json', 'w', encoding='utf-8') as f:
-    json.dump(mark_these, f, indent=2)
+# Nur für das Backend gedacht - kompakt ohne Einrückung
+with open('mark-these-articles.json', 'wb') as f:
+    f.write(orjson.dumps(mark_these))
 print('       OK: mark-these-articles.json')
 
 # Update SQL/Script Commands
-with open('update-commands.sql', 'w', encoding='utf-8') as f:
-    f.write('-- SQL Commands to mark articles not in Excel\n')
-    f.write('-- Diese Artikel sind NUR vom Shop gecrawlt, nicht in der Excel\n\n')
-
-    # Erst alle auf false setzen (die in Excel sind)
-    f.write('-- 1. Setze alle Artikel die IN der Excel sind auf notInExcel = false\n')
-    if in_both:
-        article_nums = "','".join([a['articleNumber'] for a in in_both])
-        f.write(f"UPDATE products SET category = 'FROM_EXCEL' WHERE \"articleNumber\" IN ('{article_nums}');\n\n")
-
-    # Dann die markieren die NICHT in Excel sind
-    f.write('-- 2. Markiere alle Artikel die NICHT in der Excel sind\n')
-    if only_in_system:
-        article_nums = "','".join([a['articleNumber'] for a in only_in_system])
-        f.write(f"UPDATE products SET category = 'SHOP_ONLY' WHERE \"articleNumber\" IN ('{article_nums}');\n")
+# Statt riesiger IN (...)-Listen: Kategorien in eine Temp-Tabelle laden und
+# alle Artikel mit einem UPDATE per Join markieren
+categories = ([(a['articleNumber'], 'FROM_EXCEL') for a in in_both] +
+              [(a['articleNumber'], 'SHOP_ONLY') for a in only_in_system])
+
+sql = [
+    '-- SQL Commands to mark articles not in Excel',
+    '-- Diese Artikel sind NUR vom Shop gecrawlt, nicht in der Excel',
+    '',
+    '-- 1. Kategorie je Artikelnummer laden: FROM_EXCEL = in der Excel, SHOP_ONLY = NICHT in der Excel',
+    'CREATE TEMP TABLE _article_categories (num text PRIMARY KEY, category text NOT NULL);',
+]
+for start in range(0, len(categories), SQL_INSERT_BATCH):
+    values = ',\n'.join(f'({sql_literal(num)}, {sql_literal(category)})'
+                        for num, category in categories[start:start + SQL_INSERT_BATCH])
+    sql.append(f'INSERT INTO _article_categories VALUES\n{values};')
+sql += [
+    '',
+    '-- 2. Alle Artikel in einem Durchgang markieren',
+    'UPDATE products p SET category = c.category FROM _article_categories c WHERE p."articleNumber" = c.num;',
+    '',
+    'DROP TABLE _article_categories;',
+    ''
+]
+Path('update-commands.sql').write_bytes('\n'.join(sql).encode('utf-8'))
 
 print('       OK: update-commands.sql')
 
@@ -159,11 +168,13 @@ print('\n' + '=' * 70)
 print('ERGEBNIS:')
 print('=' * 70)
 print(f'Excel-Artikel:                    {len(excel_articles):>6}')
-print(f'System-Artikel:                   {len(all_system_articles):>6}')
+print(f'System-Artikel (mit Nummer):      {len(sys_by_num):>6}')
 print('-' * 70)
 print(f'In BEIDEN (Excel + System):       {len(in_both):>6} OK:')
 print(f'NUR im System (markieren!):       {len(only_in_system):>6} WARNUNG:️ <- WERDEN MARKIERT!')
 print(f'NUR in Excel (fehlen):            {len(only_in_excel):>6} FEHLT:')
+if without_number:
+    print(f'Ohne Artikelnummer (übersprungen): {len(without_number):>5}')
 print('=' * 70)
 
 if only_in_system:
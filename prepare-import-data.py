@@ -5,13 +5,45 @@ Bereitet die 594 fehlenden Artikel für den Import vor
 Kategorisiert sie und erstellt die Import-JSON
 """
 
+import numpy as np
 import pandas as pd
-import json
-import requests
+import orjson
 from datetime import datetime
 
+from utils.article_api import article_number, fetch_all_articles
+from utils.excel_cache import load_articles, normalize_article_numbers
+
 EXCEL_PATH = r'C:\Users\benfi\Downloads\Alle Artikel_gemerged.xlsx'
 API_URL = 'http://localhost:3001/api/articles'
+EXCEL_COLUMNS = ['Artikelnummer', 'Matchcode', 'Beschreibung', 'Einheit',
+                 'Preis 1', 'Preis 2', 'Preis 3', 'Preis 4', 'Preis pro']
+
+# Preis-Kategorien (Fall 1-4)
+AUF_ANFRAGE, TIERED, SINGLE, NO_PRICE = range(4)
+
+
+def parse_prices(col):
+    """Preis-Spalte (string-dtype) vektorisiert in float wandeln ('12,50 €' -> 12.5, sonst 0)"""
+    cleaned = col.str.replace('€', '', regex=False).str.replace(',', '.', regex=False).str.strip()
+    return pd.to_numeric(cleaned, errors='coerce').fillna(0).to_numpy(dtype=float)
+
+
+def classify_prices(p1, p2, p3, p4, auf_anfrage):
+    """Preis-Kategorie je Artikel als int8 - die Fälle greifen in dieser Reihenfolge"""
+    return np.select(
+        [
+            # Fall 1: "Auf Anfrage" oder gar kein Preis
+            auf_anfrage | ((p1 == 0) & (p2 == 0) & (p3 == 0) & (p4 == 0)),
+            # Fall 2: Staffelpreise (Preis 2, 3 oder 4 sind gefüllt)
+            (p2 > 0) | (p3 > 0) | (p4 > 0),
+            # Fall 3: Nur Einzelpreis
+            p1 > 0
+        ],
+        [AUF_ANFRAGE, TIERED, SINGLE],
+        # Fall 4: Kein gültiger Preis
+        default=NO_PRICE
+    ).astype(np.int8)
+
 
 print('='*70)
 print('VORBEREITUNG: Import von 594 fehlenden Excel-Artikeln')
@@ -19,133 +51,103 @@ print('='*70)
 
 # 1. Excel lesen
 print('\n1. Lese Excel-Datei...')
-df = pd.read_excel(EXCEL_PATH)
+df = load_articles(EXCEL_PATH, EXCEL_COLUMNS)
 print(f'   Gelesen: {len(df)} Zeilen')
 
+# Artikelnummern einmal normalisieren, Zeilen ohne Nummer fallen raus
+df = normalize_article_numbers(df)
+
 # 2. System-Artikel abrufen um fehlende zu identifizieren
 print('\n2. Identifiziere fehlende Artikel...')
-all_system_articles = []
-page = 1
-
-while True:
-    response = requests.get(f'{API_URL}?page={page}&limit=100')
-    data = response.json()
-
-    if data.get('success') and data.get('data'):
-        all_system_articles.extend(data.get('data', []))
-        if not data.get('pagination', {}).get('hasNext', False):
-            break
-        page += 1
-    else:
-        break
-
-system_article_numbers = {str(a['articleNumber']).strip() for a in all_system_articles}
+# Nur die Nummern werden gebraucht - schon beim Abruf je Seite normalisieren,
+# statt die Artikelliste danach ein zweites Mal zu durchlaufen
+system_numbers = []
+fetch_all_articles(
+    API_URL,
+    on_page=lambda page, articles: system_numbers.extend(filter(None, map(article_number, articles)))
+)
+system_article_numbers = frozenset(system_numbers)
 print(f'   System hat: {len(system_article_numbers)} Artikel')
 
-# 3. Fehlende Artikel identifizieren
-missing_articles = []
-for index, row in df.iterrows():
-    article_num = str(row['Artikelnummer']).strip()
+# 3. Fehlende Artikel identifizieren (Maske auf der ganzen Spalte statt Zeile für Zeile)
+missing_df = df[~df['Artikelnummer'].isin(system_article_numbers)]
 
-    if article_num not in system_article_numbers and article_num != 'nan':
-        missing_articles.append(row)
+print(f'   Fehlende: {len(missing_df)} Artikel')
 
-print(f'   Fehlende: {len(missing_articles)} Artikel')
+# 4. Kategorisiere und bereite Import vor - alle Preise spaltenweise auf einmal
+# Jede Preis-Spalte nur einmal in Text wandeln; "Auf Anfrage" wird einmal pro
+# Spalte erkannt, die Zahl-Umwandlung muss danach nur noch €/Komma behandeln
+price_columns = [missing_df[f'Preis {i}'].astype('string') for i in range(1, 5)]
+auf_anfrage_mask = price_columns[0].str.contains('auf anfrage', case=False, na=False).to_numpy()
+p1, p2, p3, p4 = (parse_prices(col) for col in price_columns)
 
-# 4. Kategorisiere und bereite Import vor
-import_articles = []
+category = classify_prices(p1, p2, p3, p4, auf_anfrage_mask)
+is_tiered = category == TIERED
+
+# Basis-Preis: bei Staffelpreisen Preis 1, falls leer Preis 2
+price = np.where(is_tiered, np.where(p1 > 0, p1, p2), np.where(category == SINGLE, p1, 0))
+price_text = np.select([category == AUF_ANFRAGE, category == NO_PRICE], ['Auf Anfrage', 'Preis nicht verfügbar'], default='')
+
+# Staffelpreise: nur Stufen die sich von der vorherigen unterscheiden
+tier2 = is_tiered & (p2 > 0) & (p2 != p1)
+tier3 = is_tiered & (p3 > 0) & (p3 != p2)
+tier4 = is_tiered & (p4 > 0) & (p4 != p3)
+has_tiers = tier2 | tier3 | tier4
+
+counts = np.bincount(category, minlength=4)
 stats = {
-    'single_price': 0,
-    'tiered_price': 0,
-    'auf_anfrage': 0,
-    'needs_tier_quantities': 0
+    # Staffelpreis-Artikel ohne echte Stufen (alle Preise gleich) zählen als Einzelpreis
+    'single_price': int(counts[SINGLE] + (is_tiered & ~has_tiers).sum()),
+    'tiered_price': int(has_tiers.sum()),
+    'auf_anfrage': int(counts[AUF_ANFRAGE] + counts[NO_PRICE]),
+    'needs_tier_quantities': int(has_tiers.sum())
 }
 
-for row in missing_articles:
+# Import-Artikel und Nachpflege-Zeilen in einem Durchlauf erzeugen
+import_articles = []
+nachpflege_data = []
+for art_num, name, desc, einheit, base_price, note, use2, preis2, use3, preis3, use4, preis4 in zip(
+        missing_df['Artikelnummer'].tolist(),
+        missing_df['Matchcode'].fillna('').tolist(),
+        missing_df['Beschreibung'].fillna('').tolist(),
+        missing_df['Einheit'].fillna('').tolist(),
+        price.tolist(), price_text.tolist(),
+        tier2.tolist(), p2.tolist(), tier3.tolist(), p3.tolist(), tier4.tolist(), p4.tolist()):
     article = {
-        'articleNumber': str(row['Artikelnummer']).strip(),
-        'productName': str(row.get('Matchcode', '')),
-        'description': str(row.get('Beschreibung', '')),
+        'articleNumber': art_num,
+        'productName': name,
+        'description': desc,
         'currency': 'EUR',
         'sourceUrl': 'https://shop.firmenich.de',
         'category': 'FROM_EXCEL',
         'published': True,
         'verified': True,  # Normale Artikel sind verifiziert
-        'ocrConfidence': 1.0
+        'ocrConfidence': 1.0,
+        'price': base_price
     }
+    if note:
+        article['tieredPricesText'] = note
 
-    # Preis-Analyse
-    preis1 = row.get('Preis 1', 0)
-    preis2 = row.get('Preis 2', 0)
-    preis3 = row.get('Preis 3', 0)
-    preis4 = row.get('Preis 4', 0)
-    einheit = str(row.get('Einheit', 'Stück'))
-    preis_pro = row.get('Preis pro', 1)
-
-    # Konvertiere Preise zu float wo möglich
-    def to_float(val):
-        if pd.isna(val):
-            return 0
-        if isinstance(val, str):
-            if 'Auf Anfrage' in val or 'auf Anfrage' in val:
-                return 'Auf Anfrage'
-            try:
-                return float(val.replace(',', '.').replace('€', '').strip())
-            except:
-                return 0
-        try:
-            return float(val)
-        except:
-            return 0
-
-    preis1 = to_float(preis1)
-    preis2 = to_float(preis2)
-    preis3 = to_float(preis3)
-    preis4 = to_float(preis4)
-
-    # Fall 1: "Auf Anfrage"
-    if preis1 == 'Auf Anfrage' or (preis1 == 0 and preis2 == 0 and preis3 == 0 and preis4 == 0):
-        article['price'] = 0
-        article['tieredPricesText'] = 'Auf Anfrage'
-        stats['auf_anfrage'] += 1
-
-    # Fall 2: Staffelpreise (Preis 2, 3 oder 4 sind gefüllt)
-    elif preis2 > 0 or preis3 > 0 or preis4 > 0:
-        # Basis-Preis
-        article['price'] = preis1 if preis1 > 0 else preis2
-
-        # Staffelpreise sammeln
-        tiers = []
-        if preis2 > 0 and preis2 != preis1:
-            tiers.append({'quantity': None, 'price': preis2})
-        if preis3 > 0 and preis3 != preis2:
-            tiers.append({'quantity': None, 'price': preis3})
-        if preis4 > 0 and preis4 != preis3:
-            tiers.append({'quantity': None, 'price': preis4})
-
-        if tiers:
-            article['tieredPrices'] = tiers
-            article['verified'] = False  # Nicht verifiziert wegen fehlender Mengen
-            article['manufacturer'] = 'NEEDS_TIER_QUANTITIES'  # Markierung!
-            stats['tiered_price'] += 1
-            stats['needs_tier_quantities'] += 1
-        else:
-            # Alle Preise gleich, nur Einzelpreis
-            stats['single_price'] += 1
-
-    # Fall 3: Nur Einzelpreis
-    elif preis1 > 0:
-        article['price'] = preis1
-        stats['single_price'] += 1
-
-    # Fall 4: Kein gültiger Preis
-    else:
-        article['price'] = 0
-        article['tieredPricesText'] = 'Preis nicht verfügbar'
-        stats['auf_anfrage'] += 1
+    tiers = [{'quantity': None, 'price': tier_price}
+             for use, tier_price in ((use2, preis2), (use3, preis3), (use4, preis4)) if use]
+    if tiers:
+        article['tieredPrices'] = tiers
+        article['verified'] = False  # Nicht verifiziert wegen fehlender Mengen
+        article['manufacturer'] = 'NEEDS_TIER_QUANTITIES'  # Markierung!
+
+        # Zeile für die Nachpflege-CSV, Mengen bleiben leer für manuelle Eingabe
+        row_data = {
+            'Artikelnummer': art_num,
+            'Produktname': name[:50],
+            'Preis_1': base_price
+        }
+        for i, tier in enumerate(tiers, 2):
+            row_data[f'Preis_{i}'] = tier['price']
+            row_data[f'Ab_Menge_{i}'] = ''
+        nachpflege_data.append(row_data)
 
     # Zusätzliche Felder
-    if einheit and einheit != 'nan':
+    if einheit:
         article['ean'] = einheit  # Missbrauche EAN-Feld für Einheit
 
     import_articles.append(article)
@@ -165,31 +167,13 @@ import_data = {
     'articles': import_articles
 }
 
-with open('import-ready.json', 'w', encoding='utf-8') as f:
-    json.dump(import_data, f, ensure_ascii=False, indent=2)
+with open('import-ready.json', 'wb') as f:
+    f.write(orjson.dumps(import_data, option=orjson.OPT_INDENT_2))
 print(f'\n4. Import-Datei erstellt: import-ready.json')
 print(f'   Enthält {len(import_articles)} Artikel')
 
 # 6. Erstelle CSV für Nachpflege der Staffelpreise
 print('\n5. Erstelle Nachpflege-CSV für Staffelpreis-Artikel...')
-nachpflege_data = []
-
-for article in import_articles:
-    if article.get('manufacturer') == 'NEEDS_TIER_QUANTITIES':
-        row_data = {
-            'Artikelnummer': article['articleNumber'],
-            'Produktname': article['productName'][:50],
-            'Preis_1': article['price']
-        }
-
-        # Füge Staffelpreise hinzu
-        if 'tieredPrices' in article:
-            for i, tier in enumerate(article['tieredPrices'], 2):
-                row_data[f'Preis_{i}'] = tier['price']
-                row_data[f'Ab_Menge_{i}'] = ''  # Leer für manuelle Eingabe
-
-        nachpflege_data.append(row_data)
-
 if nachpflege_data:
     nachpflege_df = pd.DataFrame(nachpflege_data)
     nachpflege_df.to_csv('nachpflege-staffelmengen.csv', index=False, encoding='utf-8-sig')
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""
+Gemeinsame Hilfsfunktionen für die Artikel-Skripte im Projekt-Root
+"""
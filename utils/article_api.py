@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Holt alle Artikel aus der System-API
+
+Zuerst wird eine große Seite (LARGE_LIMIT) angefragt - meldet die API
+hasNext=False, bleibt es bei diesem einen Request. Sonst steht die
+Seitenzahl nach dem ersten Aufruf fest, die restlichen Seiten werden
+parallel über eine gemeinsame Session (Keep-Alive) abgerufen. Lehnt der
+Server das große Limit ab (400/413), wird mit PAGE_LIMIT geblättert.
+"""
+
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+MAX_WORKERS = 8
+REQUEST_TIMEOUT = 10
+LARGE_LIMIT = 2000  # wie in backend/check-missing-articles.py
+PAGE_LIMIT = 100
+
+
+def create_session():
+    """Session mit Connection-Pool (Keep-Alive) und Retry bei 502/503/504"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=MAX_WORKERS,
+        pool_maxsize=MAX_WORKERS,
+        max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def fetch_pages(session, api_url, pages, limit):
+    """Die angegebenen Seiten parallel abrufen, Reihenfolge bleibt erhalten"""
+    def fetch_page(page):
+        return session.get(f'{api_url}?page={page}&limit={limit}', timeout=REQUEST_TIMEOUT).json()
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        return list(executor.map(fetch_page, pages))
+
+
+def fetch_all_articles(api_url, total=None, limit=LARGE_LIMIT, on_page=None, session=None):
+    """Alle System-Artikel abrufen, on_page(page, articles) wird je Seite aufgerufen"""
+    session = session or create_session()
+    response = session.get(f'{api_url}?page=1&limit={limit}', timeout=REQUEST_TIMEOUT)
+
+    if response.status_code in (400, 413):
+        # Großes Limit abgelehnt -> klassisch in kleinen Seiten blättern
+        limit = PAGE_LIMIT
+        if total is None:
+            response = session.get(f'{api_url}?limit=1', timeout=REQUEST_TIMEOUT)
+            total = response.json().get('pagination', {}).get('total', 0)
+        pages = list(range(1, math.ceil(total / limit) + 1))
+        results = fetch_pages(session, api_url, pages, limit)
+    else:
+        first = response.json()
+        pagination = first.get('pagination', {})
+        if pagination.get('hasNext', True) is False:
+            pages, results = [1], [first]
+        else:
+            # Server kann das Limit kappen - ohne Angabe gilt die Größe der ersten Seite
+            limit = pagination.get('limit') or len(first.get('data') or []) or limit
+            total = pagination.get('total', total or 0)
+            pages = list(range(1, max(1, math.ceil(total / limit)) + 1))
+            results = [first] + fetch_pages(session, api_url, pages[1:], limit)
+
+    # Meldet die letzte Seite noch hasNext (z.B. weil der Server weniger liefert
+    # als angegeben), wie früher nacheinander weiterblättern statt Artikel zu verlieren
+    while results and results[-1].get('data') and results[-1].get('pagination', {}).get('hasNext'):
+        pages.append(pages[-1] + 1)
+        results.append(session.get(f'{api_url}?page={pages[-1]}&limit={limit}', timeout=REQUEST_TIMEOUT).json())
+
+    all_articles = []
+    for page, data in zip(pages, results):
+        # Wie bisher bei der ersten fehlerhaften Seite aufhören
+        if not data.get('success') or not data.get('data'):
+            break
+        all_articles.extend(data['data'])
+        if on_page:
+            on_page(page, data['data'])
+    return all_articles
+
+
+def article_number(article):
+    """Getrimmte Artikelnummer eines System-Artikels, '' wenn er keine hat"""
+    return str(article.get('articleNumber') or '').strip()
+
+
+def articles_by_number(articles):
+    """System-Artikel einmal nach getrimmter Artikelnummer ablegen, ohne Nummer fallen sie raus"""
+    by_number = {}
+    for article in articles:
+        number = article_number(article)
+        if number:
+            by_number[number] = article
+    return by_number
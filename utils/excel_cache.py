@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Lädt die Artikel-Excel mit Parquet-Cache
+
+Die .xlsx wird einmal mit calamine geparst und als Parquet daneben abgelegt.
+Solange die Excel nicht neuer ist als der Cache, lesen alle Skripte nur noch
+die Parquet-Datei.
+"""
+
+import numbers
+from pathlib import Path
+
+import pandas as pd
+
+# Text-Spalten direkt als string-dtype lesen statt object
+TEXT_DTYPES = {'Artikelnummer': 'string', 'Matchcode': 'string', 'Beschreibung': 'string', 'Einheit': 'string'}
+
+# engine='calamine' gibt es in pandas erst ab 2.2
+PANDAS_HAS_CALAMINE = tuple(int(p) for p in pd.__version__.split('.')[:2]) >= (2, 2)
+
+# Gemischte Spalten werden als Text gecacht; je Zelle merkt sich eine
+# Typ-Spalte '__typ__<Spalte>', welche Werte vorher Zahlen waren
+TYPE_PREFIX = '__typ__'
+CELL_TYPES = {'int': int, 'float': float, 'bool': lambda s: s == 'True'}
+
+
+def load_articles(path, cols=None):
+    """Artikel-Excel laden, bevorzugt aus dem Parquet-Cache neben der .xlsx
+
+    Parst bewusst das ganze Blatt (ohne usecols), damit ein Cache für alle
+    Skripte reicht - cols wählt nur aus dem fertigen Frame aus.
+    """
+    xlsx = Path(path)
+    cache = xlsx.with_suffix('.parquet')
+
+    df = None
+    if cache.exists() and cache.stat().st_mtime >= xlsx.stat().st_mtime:
+        cached = pd.read_parquet(cache, engine='pyarrow')
+        # Cache ohne Typ-Spalten (ältere Version) wird neu aufgebaut
+        if all(TYPE_PREFIX + c in cached.columns for c in mixed_columns(cached)):
+            df = restore_mixed_columns(cached)
+
+    if df is None:
+        # Immer das ganze Blatt cachen, damit jedes Skript den Cache nutzen kann
+        df = load_excel(xlsx)
+        try:
+            stringify_mixed_columns(df).to_parquet(cache, engine='pyarrow', compression='zstd')
+        except (ImportError, OSError, ValueError, TypeError) as e:
+            # pyarrow meldet nicht speicherbare Spalten (z.B. Datum neben Text)
+            # als ArrowTypeError/ArrowInvalid - dann ohne Cache weiterarbeiten
+            cache.unlink(missing_ok=True)
+            print(f'   Hinweis: Parquet-Cache nicht geschrieben ({e})')
+
+    return df if cols is None else df[cols]
+
+
+def normalize_article_numbers(df, column='Artikelnummer'):
+    """Artikelnummern einmal trimmen und Zeilen ohne Nummer verwerfen"""
+    df = df.assign(**{column: df[column].astype('string').str.strip()})
+    return df[df[column].notna() & df[column].ne('')]
+
+
+def load_excel(path, cols=None):
+    """Liest die Excel mit calamine (Rust) statt openpyxl, mit cols nur diese Spalten
+
+    Für einmalige Lesevorgänge ohne Cache, z.B. backend/check-missing-articles.py.
+    """
+    if PANDAS_HAS_CALAMINE:
+        return pd.read_excel(path, usecols=cols, dtype=TEXT_DTYPES, engine='calamine')
+
+    # Ältere pandas: python-calamine direkt nutzen
+    from python_calamine import CalamineWorkbook
+    header, *rows = CalamineWorkbook.from_path(path).get_sheet_by_index(0).to_python()
+    df = pd.DataFrame([[calamine_cell(v) for v in row] for row in rows], columns=header)
+    if cols is not None:
+        df = df[cols]
+    return df.astype({c: t for c, t in TEXT_DTYPES.items() if c in df.columns})
+
+
+def calamine_cell(value):
+    """Zelle wie pandas konvertieren: leer -> None, ganzzahlige Floats -> int"""
+    if value == '':
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def mixed_columns(df):
+    """Spalten mit gemischten Werten, z.B. 'Preis 1' mit Zahlen und 'Auf Anfrage'"""
+    return [c for c in df.columns
+            if c not in TEXT_DTYPES and not str(c).startswith(TYPE_PREFIX) and df[c].dtype == object]
+
+
+def cell_type(value):
+    """Typ-Kennung einer Zahlen-Zelle (Schlüssel aus CELL_TYPES), None für Text und leere Zellen"""
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, numbers.Integral):
+        return 'int'
+    if isinstance(value, numbers.Real):
+        return 'float'
+    return None
+
+
+def stringify_mixed_columns(df):
+    """Parquet kann keine gemischten Spalten speichern - Werte als Text ablegen, Typ daneben"""
+    columns = {}
+    for col in mixed_columns(df):
+        types = df[col].map(cell_type)
+        columns[col] = df[col].where(types.isna(), df[col].astype(str))
+        columns[TYPE_PREFIX + col] = types
+    return df.assign(**columns)
+
+
+def restore_mixed_columns(df):
+    """Nur die Zellen, die vor dem Cachen Zahlen waren, wieder in ihren Typ wandeln"""
+    for col in mixed_columns(df):
+        types = df.pop(TYPE_PREFIX + col)
+        values = df[col].to_numpy(dtype=object, copy=True)
+        for name, convert in CELL_TYPES.items():
+            mask = (types == name).to_numpy()
+            values[mask] = [convert(v) for v in values[mask]]
+        df[col] = values
+    return df